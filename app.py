@@ -1,16 +1,60 @@
 from flask import Flask, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import os
-from datetime import datetime, timedelta
-from scipy.stats import poisson  # Pour les prédictions Poisson
+import threading
+import time
+from math import exp  # Loi de Poisson en forme fermée pour les prédictions
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from cachetools import TTLCache, cached
+import redis
+import xxhash
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Sérialisation JSON de Flask via orjson ; seules les options qu'orjson ne sait pas reproduire restent sur json."""
+
+    def dumps(self, obj, **kwargs):
+        indent = kwargs.get("indent")
+        if (set(kwargs) - {"sort_keys", "indent", "separators", "default"}
+                or indent not in (None, 2)
+                or kwargs.get("separators") not in (None, (",", ":"))  # orjson écrit déjà en compact
+                or kwargs.get("default", self.default) != self.default):
+            return super().dumps(obj, **kwargs)  # cls, object_hook, default personnalisé...
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME  # Dates au format HTTP, comme Flask
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2  # jsonify en mode debug
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)  # object_hook du TaggedJSONSerializer de la session
+        return orjson.loads(s)
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Configuration de l'API
 API_TOKEN = os.getenv("API_TOKEN", "c67e9f5362d54bcdb5042f6f3e2ec0c2")  # Clé depuis variable d’environnement
 BASE_URL = "http://api.football-data.org/v4"
 HEADERS = {"X-Auth-Token": API_TOKEN}
+API_TIMEOUT = (3.05, 10)  # (connexion, lecture) en secondes, pour chaque tentative
+
+# Session partagée : connexions keep-alive réutilisées entre les requêtes Flask
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504]),
+)
+SESSION.mount("http://", _ADAPTER)
+SESSION.mount("https://", _ADAPTER)
 
 # Compétitions à inclure (codes de Football-Data.org)
 COMPETITIONS = [
@@ -28,13 +72,56 @@ COMPETITIONS = [
 TEAMS_CACHE_FILE = "teams_cache.json"
 CACHE_DURATION = timedelta(days=2)  # Mettre à jour toutes les semaines
 
+# Cache mémoire des équipes, invalidé si le fichier change ou après TEAMS_MEMORY_TTL
+TEAMS_MEMORY_TTL = 60  # En secondes
+_TEAMS_CACHE = {"mtime": 0, "loaded_at": 0, "hash": None, "data": None}
+_TEAMS_LOCK = threading.Lock()  # Un seul thread recharge ou rafraîchit les équipes
+
+# Cache des matchs récents par équipe, clé (team_id, dateFrom, dateTo)
+MATCHES_CACHE_TTL = 3600  # En secondes
+MATCHES_WINDOW = timedelta(days=90)
+_MATCHES_CACHE = TTLCache(maxsize=1024, ttl=MATCHES_CACHE_TTL)
+_DATE_CACHE = {"day": None, "from": None, "to": None}  # Fenêtre de dates, recalculée au changement de jour
+
+# Cache des prédictions par affiche, clé (domicile, extérieur, jour courant)
+PREDICTIONS_CACHE_TTL = 3600  # En secondes
+_PREDICTIONS_CACHE = TTLCache(maxsize=4096, ttl=PREDICTIONS_CACHE_TTL)
+_PREDICTIONS_LOCK = threading.Lock()
+
+# Page d'accueil en cache : (données des équipes, ETag, HTML), remplacée quand les équipes changent
+_HOME_PAGE = {"entry": None}
+
+# Cache Redis partagé entre les workers gunicorn (niveau 2, sous les caches mémoire)
+REDIS_URL = os.getenv("REDIS_URL")  # Désactivé si non défini
+REDIS = redis.Redis.from_url(REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5) if REDIS_URL else None
+
+def redis_get(key):
+    """Lit une valeur JSON dans Redis (None si absente, illisible ou si Redis est indisponible)."""
+    if REDIS is None:
+        return None
+    try:
+        raw = REDIS.get(key)
+        return orjson.loads(raw) if raw is not None else None
+    except (redis.RedisError, orjson.JSONDecodeError) as e:
+        print(f"Erreur Redis (lecture {key}): {e}")
+        return None
+
+def redis_set(key, value, ttl):
+    """Écrit une valeur JSON dans Redis avec une durée de vie (ignoré si Redis est indisponible)."""
+    if REDIS is None:
+        return
+    try:
+        REDIS.setex(key, ttl, orjson.dumps(value))
+    except redis.RedisError as e:
+        print(f"Erreur Redis (écriture {key}): {e}")
+
 def fetch_teams_from_api(competition_code):
     """Récupère les équipes d'une compétition via l'API."""
     url = f"{BASE_URL}/competitions/{competition_code}/teams"
     try:
-        response = requests.get(url, headers=HEADERS)
+        response = SESSION.get(url, timeout=API_TIMEOUT)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)  # orjson décode directement les octets
         teams = {
             team["name"]: {
                 "id": team["id"],
@@ -42,64 +129,128 @@ def fetch_teams_from_api(competition_code):
             } for team in data["teams"]
         }
         return teams
-    except requests.RequestException as e:
+    except (requests.RequestException, orjson.JSONDecodeError) as e:
         print(f"Erreur lors de la récupération des équipes pour {competition_code}: {e}")
         return {}
 
+def teams_hash(teams, league_teams):
+    """Empreinte xxh3 du contenu des équipes, pour détecter les rafraîchissements sans changement."""
+    return xxhash.xxh3_64_hexdigest(orjson.dumps([teams, league_teams]))
+
 def update_teams_cache():
     """Met à jour le cache des équipes pour toutes les compétitions."""
     all_teams = {}
     league_teams = {}
-    for comp in COMPETITIONS:
-        teams = fetch_teams_from_api(comp["code"])
+    # Les appels sont limités par le réseau : on les lance en parallèle
+    with ThreadPoolExecutor(max_workers=len(COMPETITIONS)) as executor:
+        results = list(executor.map(lambda comp: (comp["name"], fetch_teams_from_api(comp["code"])), COMPETITIONS))
+    for name, teams in results:
         if teams:
-            league_teams[comp["name"]] = sorted(teams.keys())  # Trier par nom
+            league_teams[name] = sorted(teams.keys())  # Trier par nom
             all_teams.update(teams)
+    teams_sorted = sorted(all_teams.keys())
+    content_hash = teams_hash(all_teams, league_teams)
+    if not all_teams:
+        return all_teams, league_teams, teams_sorted, content_hash  # Rien reçu de l'API : on n'écrase pas le cache existant
     
     # Sauvegarder dans le cache
     cache_data = {
         "teams": all_teams,
         "league_teams": league_teams,
-        "last_updated": datetime.now().isoformat()
+        "teams_sorted": teams_sorted,  # Évite de trier à chaque chargement
+        "hash": content_hash,
+        "last_updated": datetime.now()  # orjson sérialise le datetime en ISO 8601
     }
-    with open(TEAMS_CACHE_FILE, "w") as f:
-        json.dump(cache_data, f, indent=2)
-    return all_teams, league_teams
+    # Écriture atomique : les autres workers ne lisent jamais un fichier incomplet
+    tmp_file = f"{TEAMS_CACHE_FILE}.{os.getpid()}.tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(orjson.dumps(cache_data, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_file, TEAMS_CACHE_FILE)
+    return all_teams, league_teams, teams_sorted, content_hash
+
+def _remember_teams(teams, league_teams, teams_sorted, content_hash):
+    """Mémorise les équipes (avec la liste triée) pour les requêtes suivantes."""
+    if _TEAMS_CACHE["data"] is None or content_hash != _TEAMS_CACHE["hash"]:
+        _TEAMS_CACHE["data"] = (teams, league_teams, teams_sorted)
+        _TEAMS_CACHE["hash"] = content_hash
+    # Sinon le contenu est inchangé : la copie en mémoire reste valable
+    _TEAMS_CACHE["mtime"] = os.stat(TEAMS_CACHE_FILE).st_mtime if os.path.exists(TEAMS_CACHE_FILE) else 0
+    _TEAMS_CACHE["loaded_at"] = time.time()
+    return _TEAMS_CACHE["data"]
 
 def get_teams():
-    """Récupère les équipes depuis le cache ou l'API."""
+    """Récupère les équipes (dict, par ligue, triées) depuis la mémoire, le cache ou l'API."""
+    with _TEAMS_LOCK:
+        return _load_teams()
+
+def _load_teams():
+    cached_teams = None
     if os.path.exists(TEAMS_CACHE_FILE):
-        with open(TEAMS_CACHE_FILE, "r") as f:
-            cache_data = json.load(f)
+        mtime = os.stat(TEAMS_CACHE_FILE).st_mtime
+        if (_TEAMS_CACHE["data"] is not None and mtime == _TEAMS_CACHE["mtime"]
+                and time.time() - _TEAMS_CACHE["loaded_at"] < TEAMS_MEMORY_TTL):
+            return _TEAMS_CACHE["data"]
+        with open(TEAMS_CACHE_FILE, "rb") as f:
+            cache_data = orjson.loads(f.read())
+        teams, league_teams = cache_data["teams"], cache_data["league_teams"]
+        cached_teams = (
+            teams,
+            league_teams,
+            cache_data.get("teams_sorted") or sorted(teams.keys()),  # Anciens fichiers sans liste triée
+            cache_data.get("hash") or teams_hash(teams, league_teams),
+        )
         last_updated = datetime.fromisoformat(cache_data["last_updated"])
         if datetime.now() - last_updated < CACHE_DURATION:
-            return cache_data["teams"], cache_data["league_teams"]
+            return _remember_teams(*cached_teams)
     
     # Si le cache est obsolète ou n'existe pas, mettre à jour
-    return update_teams_cache()
+    refreshed = update_teams_cache()
+    if not refreshed[0] and cached_teams:
+        refreshed = cached_teams  # API indisponible : on garde l'ancien cache, nouvel essai après TEAMS_MEMORY_TTL
+    return _remember_teams(*refreshed)
 
-def get_team_matches(team_id):
-    """Récupère les matchs récents d'une équipe."""
+def _match_window():
+    """Retourne (dateFrom, dateTo) pour les matchs récents, formatés une fois par jour."""
+    today = date.today()
+    if _DATE_CACHE["day"] != today:
+        _DATE_CACHE.update({"day": today, "from": (today - MATCHES_WINDOW).isoformat(), "to": today.isoformat()})
+    return _DATE_CACHE["from"], _DATE_CACHE["to"]
+
+@cached(_MATCHES_CACHE, lock=threading.Lock())
+def _fetch_team_matches(team_id, date_from, date_to):
+    """Interroge Redis puis l'API pour les matchs récents d'une équipe (résultat mis en cache)."""
+    redis_key = f"matches:{team_id}:{date_from}:{date_to}"
+    matches = redis_get(redis_key)
+    if isinstance(matches, list):
+        return matches
     url = f"{BASE_URL}/teams/{team_id}/matches"
     params = {
         "status": "FINISHED",
-        "dateFrom": (datetime.today() - timedelta(days=90)).strftime('%Y-%m-%d'),
-        "dateTo": datetime.today().strftime('%Y-%m-%d'),
+        "dateFrom": date_from,
+        "dateTo": date_to,
         "limit": 10
     }
+    response = SESSION.get(url, params=params, timeout=API_TIMEOUT)
+    response.raise_for_status()
+    matches = orjson.loads(response.content)["matches"]
+    redis_set(redis_key, matches, MATCHES_CACHE_TTL)
+    return matches
+
+def get_team_matches(team_id):
+    """Récupère les matchs récents d'une équipe (les erreurs ne sont pas mises en cache)."""
     try:
-        response = requests.get(url, headers=HEADERS, params=params)
-        response.raise_for_status()
-        return response.json()["matches"]
-    except requests.RequestException:
+        return _fetch_team_matches(team_id, *_match_window())
+    except (requests.RequestException, orjson.JSONDecodeError):
         return []
 
-def get_relevant_matches(home_team, away_team, team_ids):
-    """Récupère les matchs pertinents pour deux équipes."""
-    home_matches = get_team_matches(team_ids[home_team]["id"])
-    away_matches = get_team_matches(team_ids[away_team]["id"])
-    head_to_head = [match for match in home_matches if match["awayTeam"]["id"] == team_ids[away_team]["id"]]
-    return head_to_head + home_matches[:5] + away_matches[:5]
+def get_relevant_matches(home_id, away_id):
+    """Récupère les matchs pertinents pour deux équipes (par identifiant)."""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        home_future = executor.submit(get_team_matches, home_id)
+        away_future = executor.submit(get_team_matches, away_id)
+        home_matches, away_matches = home_future.result(), away_future.result()
+    head_to_head = [match for match in home_matches if match["awayTeam"]["id"] == away_id]
+    return [*head_to_head, *home_matches[:5], *away_matches[:5]]  # Une seule liste construite
 
 def get_team_stats(matches, team_id):
     """Calcule les statistiques d'une équipe."""
@@ -108,26 +259,28 @@ def get_team_stats(matches, team_id):
     goals_scored = goals_conceded = half_time_wins = second_half_wins = both_teams_score = 0
     games = len(matches)
     for match in matches:
-        home_team_id = match["homeTeam"]["id"]
-        away_team_id = match["awayTeam"]["id"]
-        home_goals = match["score"]["fullTime"]["home"] or 0
-        away_goals = match["score"]["fullTime"]["away"] or 0
-        home_half = match["score"]["halfTime"]["home"] or 0
-        away_half = match["score"]["halfTime"]["away"] or 0
-        home_second = home_goals - home_half
-        away_second = away_goals - away_half
-        if home_team_id == team_id:
+        if match["homeTeam"]["id"] == team_id:
+            is_home = True
+        elif match["awayTeam"]["id"] == team_id:
+            is_home = False
+        else:
+            continue  # Les scores ne sont lus que pour les matchs de l'équipe
+        full_time = match["score"]["fullTime"]
+        half_time = match["score"]["halfTime"]
+        home_goals = full_time["home"] or 0
+        away_goals = full_time["away"] or 0
+        home_half = half_time["home"] or 0
+        away_half = half_time["away"] or 0
+        if is_home:
             goals_scored += home_goals
             goals_conceded += away_goals
-            half_time_wins += 1 if home_half > away_half else 0
-            second_half_wins += 1 if home_second > away_second else 0
-            both_teams_score += 1 if home_goals > 0 and away_goals > 0 else 0
-        elif away_team_id == team_id:
+            half_time_wins += home_half > away_half
+        else:
             goals_scored += away_goals
             goals_conceded += home_goals
-            half_time_wins += 1 if away_half > home_half else 0
-            second_half_wins += 1 if home_second > away_second else 0
-            both_teams_score += 1 if home_goals > 0 and away_goals > 0 else 0
+            half_time_wins += away_half > home_half
+        second_half_wins += home_goals - home_half > away_goals - away_half
+        both_teams_score += home_goals > 0 and away_goals > 0
     return {
         "goals_avg_scored": round(goals_scored / max(1, games), 2),
         "goals_avg_conceded": round(goals_conceded / max(1, games), 2),
@@ -136,102 +289,113 @@ def get_team_stats(matches, team_id):
         "both_teams_score_rate": round(both_teams_score / max(1, games), 2)
     }
 
-def predict_result(home_team, away_team, matches, team_ids):
-    """Prédit le résultat 1X2 avec une méthode simple basée sur les stats."""
-    home_stats = get_team_stats(matches, team_ids[home_team]["id"])
-    away_stats = get_team_stats(matches, team_ids[away_team]["id"])
-    home_strength = home_stats["goals_avg_scored"] + 1
-    away_strength = away_stats["goals_avg_scored"] + 1
-    total = home_strength + away_strength + 1
-    probas = {"1": home_strength / total, "X": 1 / total, "2": away_strength / total}
-    return max(probas, key=probas.get)
+def _round2(x):
+    """Arrondi à 2 décimales comme numpy (x * 100 arrondi au pair, puis / 100), pour garder l'affichage historique."""
+    return round(x * 100) / 100
 
-def predict_double_chance(home_team, away_team, matches, team_ids):
-    """Prédit la double chance."""
-    home_stats = get_team_stats(matches, team_ids[home_team]["id"])
-    away_stats = get_team_stats(matches, team_ids[away_team]["id"])
+def make_predictions(home_stats, away_stats):
+    """Calcule toutes les prédictions (1X2, double chance, buts, score, mi-temps, Plus/Moins, BTTS) en une passe."""
+    # 1X2 et double chance : forces offensives normalisées
     home_strength = home_stats["goals_avg_scored"] + 1
     away_strength = away_stats["goals_avg_scored"] + 1
     total = home_strength + away_strength + 1
-    probas = {"1X": home_strength / total + 1 / total, "X2": 1 / total + away_strength / total, "12": home_strength / total + away_strength / total}
-    return max(probas, key=probas.get)
-
-def predict_goals(home_team, away_team, matches, team_ids):
-    """Prédit le nombre total de buts avec Poisson."""
-    home_stats = get_team_stats(matches, team_ids[home_team]["id"])
-    away_stats = get_team_stats(matches, team_ids[away_team]["id"])
-    home_goals = poisson.mean(home_stats["goals_avg_scored"] * away_stats["goals_avg_conceded"])
-    away_goals = poisson.mean(away_stats["goals_avg_scored"] * home_stats["goals_avg_conceded"])
-    total_goals = home_goals + away_goals
-    return round(total_goals, 2), home_goals, away_goals  # Retourne total, home, away
-
-def predict_over_under_2_5(home_team, away_team, matches, team_ids):
-    """Prédit Plus/Moins de 2.5 buts avec Poisson."""
-    total_goals, home_goals, away_goals = predict_goals(home_team, away_team, matches, team_ids)
-    prob_over = 1 - poisson.cdf(2.5, total_goals)  # Probabilité > 2.5 buts
-    return "Plus de 2.5 buts" if prob_over > 0.5 else "Moins de 2.5 buts", round(prob_over * 100, 2)
-
-def predict_both_teams_score(home_team, away_team, matches, team_ids):
-    """Prédit si les deux équipes marquent (BTTS) avec Poisson."""
-    total_goals, home_goals, away_goals = predict_goals(home_team, away_team, matches, team_ids)
-    prob_no_goal_home = poisson.pmf(0, home_goals)  # Prob qu'à domicile ne marque pas
-    prob_no_goal_away = poisson.pmf(0, away_goals)  # Prob qu'à l'extérieur ne marque pas
-    prob_btts = 1 - (prob_no_goal_home * prob_no_goal_away)  # Prob que les deux marquent
-    return "Oui" if prob_btts > 0.5 else "Non", round(prob_btts * 100, 2)
-
-def predict_exact_score(home_team, away_team, matches, team_ids):
-    """Prédit le score exact basé sur les moyennes Poisson."""
-    total_goals, home_goals, away_goals = predict_goals(home_team, away_team, matches, team_ids)
-    return f"{int(round(home_goals, 0))}-{int(round(away_goals, 0))}"
-
-def predict_half_time_winner(home_team, away_team, matches, team_ids):
-    """Prédit le vainqueur à la mi-temps (simplifié)."""
-    home_stats = get_team_stats(matches, team_ids[home_team]["id"])
-    away_stats = get_team_stats(matches, team_ids[away_team]["id"])
-    home_proba = home_stats["half_time_win_rate"]
-    away_proba = away_stats["half_time_win_rate"]
-    total = home_proba + away_proba + 0.1
-    probas = {"1": home_proba / total, "X": 0.1 / total, "2": away_proba / total}
-    return max(probas, key=probas.get)
+    p_home, p_draw, p_away = home_strength / total, 1 / total, away_strength / total
+    result_probas = {"1": p_home, "X": p_draw, "2": p_away}
+    double_chance_probas = {"1X": p_home + p_draw, "X2": p_draw + p_away, "12": p_home + p_away}
+
+    # Nombre de buts attendus avec Poisson (la moyenne d'une loi de Poisson est λ)
+    home_goals = float(home_stats["goals_avg_scored"] * away_stats["goals_avg_conceded"])
+    away_goals = float(away_stats["goals_avg_scored"] * home_stats["goals_avg_conceded"])
+    total_goals = _round2(home_goals + away_goals)
+    # P(X ≤ 2) = e^-λ (1 + λ + λ²/2), donc P(> 2.5 buts) = 1 - P(X ≤ 2)
+    prob_over = 1 - exp(-total_goals) * (1 + total_goals + total_goals * total_goals / 2)
+    prob_btts = 1 - exp(-home_goals) * exp(-away_goals)  # P(0 but) = e^-λ pour chaque équipe
+
+    # Vainqueur à la mi-temps (simplifié)
+    home_half = home_stats["half_time_win_rate"]
+    away_half = away_stats["half_time_win_rate"]
+    half_total = home_half + away_half + 0.1
+    half_probas = {"1": home_half / half_total, "X": 0.1 / half_total, "2": away_half / half_total}
+
+    over_under = "Plus de 2.5 buts" if prob_over > 0.5 else "Moins de 2.5 buts"
+    btts = "Oui" if prob_btts > 0.5 else "Non"
+    return {
+        "result": max(result_probas, key=result_probas.get),
+        "double_chance": max(double_chance_probas, key=double_chance_probas.get),
+        "goals": f"{total_goals} buts (intervalle : {int(total_goals - 1)}-{int(total_goals + 1)})",
+        "exact_score": f"{int(round(home_goals, 0))}-{int(round(away_goals, 0))}",
+        "half_winner": max(half_probas, key=half_probas.get),
+        "over_under": f"{over_under} ({_round2(prob_over * 100)}%)",
+        "both_teams_score": f"{btts} ({_round2(prob_btts * 100)}%)"
+    }
+
+def predict_match(home_id, away_id):
+    """Retourne (home_stats, away_stats, predictions) pour une affiche, ou None sans données."""
+    key = (home_id, away_id, date.today())
+    with _PREDICTIONS_LOCK:
+        result = _PREDICTIONS_CACHE.get(key)
+    if result is not None:
+        return result
+    redis_key = "predictions:{}:{}:{}".format(*key)
+    shared = redis_get(redis_key)
+    # Seule une entrée (home_stats, away_stats, predictions) est réutilisée ; sinon on recalcule
+    if isinstance(shared, list) and len(shared) == 3 and all(isinstance(part, dict) for part in shared):
+        result = tuple(shared)
+        with _PREDICTIONS_LOCK:
+            _PREDICTIONS_CACHE[key] = result
+        return result
+    historical_matches = get_relevant_matches(home_id, away_id)
+    if not historical_matches:
+        return None  # Pas mis en cache : l'API peut avoir échoué temporairement
+    home_stats = get_team_stats(historical_matches, home_id)
+    away_stats = get_team_stats(historical_matches, away_id)
+    result = (home_stats, away_stats, make_predictions(home_stats, away_stats))
+    with _PREDICTIONS_LOCK:
+        _PREDICTIONS_CACHE[key] = result
+    redis_set(redis_key, result, PREDICTIONS_CACHE_TTL)
+    return result
+
+def home_page(teams_data):
+    """Page d'accueil sans prédiction : rendue une fois par version des équipes, servie avec un ETag."""
+    entry = _HOME_PAGE["entry"]
+    if entry is None or entry[0] is not teams_data:
+        _, league_teams, teams = teams_data
+        html = render_template('index.html', teams=teams, predictions=None, home_team=None,
+                               away_team=None, home_logo="https://via.placeholder.com/50",
+                               away_logo="https://via.placeholder.com/50", error=None, home_stats=None,
+                               away_stats=None, is_vip=False, league_teams=league_teams).encode()
+        entry = (teams_data, xxhash.xxh3_64_hexdigest(html), html)
+        _HOME_PAGE["entry"] = entry
+    response = app.response_class(entry[2], mimetype="text/html")
+    response.set_etag(entry[1])
+    response.cache_control.no_cache = True  # Le navigateur revalide à chaque visite (réponse 304 si inchangée)
+    return response.make_conditional(request)
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
-    team_ids, league_teams = get_teams()
-    teams = sorted(team_ids.keys())
+    teams_data = get_teams()
+    if request.method != 'POST':
+        return home_page(teams_data)
+    team_ids, league_teams, teams = teams_data
     predictions = None
-    home_team = away_team = None
     home_logo = away_logo = "https://via.placeholder.com/50"
     error = None
     home_stats = away_stats = None
     is_vip = False  # À remplacer par une vraie logique d'authentification
 
-    if request.method == 'POST':
-        home_team = request.form['home_team']
-        away_team = request.form['away_team']
-        if home_team == away_team:
-            error = "Veuillez sélectionner deux équipes différentes."
-        elif home_team in team_ids and away_team in team_ids:
-            home_logo = team_ids[home_team]["logo"]
-            away_logo = team_ids[away_team]["logo"]
-            historical_matches = get_relevant_matches(home_team, away_team, team_ids)
-            if historical_matches:
-                home_stats = get_team_stats(historical_matches, team_ids[home_team]["id"])
-                away_stats = get_team_stats(historical_matches, team_ids[away_team]["id"])
-                total_goals, home_goals, away_goals = predict_goals(home_team, away_team, historical_matches, team_ids)
-                over_under, over_prob = predict_over_under_2_5(home_team, away_team, historical_matches, team_ids)
-                btts, btts_prob = predict_both_teams_score(home_team, away_team, historical_matches, team_ids)
-                predictions = {
-                    "result": predict_result(home_team, away_team, historical_matches, team_ids),
-                    "double_chance": predict_double_chance(home_team, away_team, historical_matches, team_ids),
-                    "goals": f"{total_goals} buts (intervalle : {int(total_goals - 1)}-{int(total_goals + 1)})",
-                    "exact_score": predict_exact_score(home_team, away_team, historical_matches, team_ids),
-                    "half_winner": predict_half_time_winner(home_team, away_team, historical_matches, team_ids),
-                    "over_under": f"{over_under} ({over_prob}%)",
-                    "both_teams_score": f"{btts} ({btts_prob}%)"
-                }
-            else:
-                predictions = "no_data"
-                error = "Pas assez de données historiques pour ce match."
+    home_team = request.form['home_team']
+    away_team = request.form['away_team']
+    if home_team == away_team:
+        error = "Veuillez sélectionner deux équipes différentes."
+    elif home_team in team_ids and away_team in team_ids:
+        home, away = team_ids[home_team], team_ids[away_team]
+        home_logo, away_logo = home["logo"], away["logo"]
+        result = predict_match(home["id"], away["id"])
+        if result:
+            home_stats, away_stats, predictions = result
+        else:
+            predictions = "no_data"
+            error = "Pas assez de données historiques pour ce match."
 
     return render_template('index.html', teams=teams, predictions=predictions, home_team=home_team,
                            away_team=away_team, home_logo=home_logo, away_logo=away_logo, error=error,